@@ -40,6 +40,55 @@ TONES = [
     ]
 
 
+def _from_ratios(ratios):
+    """Return read-only (ratios, cents) arrays from `ratios`."""
+    ratios = np.array(ratios, dtype=np.float64)
+    cents = 1200 * np.log2(ratios)
+    ratios.setflags(write=False)
+    cents.setflags(write=False)
+    return ratios, cents
+
+
+def _from_cents(cents):
+    """Return read-only (ratios, cents) arrays from `cents`."""
+    cents = np.array(cents, dtype=np.float64)
+    ratios = 2**(cents/1200)
+    ratios.setflags(write=False)
+    cents.setflags(write=False)
+    return ratios, cents
+
+
+# Built once at import and shared by every instance of each temperament.
+_EQUAL = _from_cents(np.arange(0, 1200, 100))
+_JUST = _from_ratios([
+    1, 16/15, 9/8, 6/5, 5/4, 4/3, 64/45, 3/2, 8/5, 5/3, 19/9, 15/8])
+_PYTHAGOREAN = _from_ratios([
+    1, 256/243, 9/8, 32/27, 81/64, 4/3,
+    729/512, 3/2, 128/81, 27/16, 16/9, 243/128])
+_MEANTONE = _from_cents([
+    0, 81.427, 194.135, 306.842, 388.270, 502.933,
+    583.383, 697.067, 780.450, 891.202, 1004.888, 1085.338
+    ])
+_WELL = _from_cents([
+    0, 90.225, 193.484, 294.135, 386.968, 498.045,
+    588.270, 696.742, 792.180, 890.226, 996.090, 1088.923
+    ])
+_RAMEAU = _from_cents([
+    0, 84.360, 192.180, 288.270, 384.360, 503.910,
+    582.405, 696.090, 786.315, 888.270, 996.090, 1080.450
+    ])
+_WERCKMEISTER_I = _from_cents([
+    0, 90.225, 192.180, 294.135, 390.225, 498.045,
+    588.270, 696.090, 792.180, 888.270, 996.090, 1092.180
+    ])
+_KIRNBERGER_III = _from_cents([
+    0, 90.225, 203.910, 294.135, 386.315, 498.045,
+    590.225, 701.955, 792.180, 884.360, 996.090, 1088.270
+    ])
+_VALLOTTI_YOUNG = _from_cents([
+    0, 94, 196, 278, 392, 475, 588, 696, 790, 894, 975, 1090])
+
+
 class Note():
     """
     Store information about a single note.
@@ -58,6 +107,8 @@ class Note():
         return '%s%s' % (self.tone, self.octave)
 
     def __eq__(self, val):
+        if isinstance(val, Note):
+            return (self.tone, self.octave) == (val.tone, val.octave)
         return self.__repr__() == val
 
 
@@ -81,12 +132,13 @@ class Temperament():
         self._name = ''
         self._reference_note = reference_note
         self._reference_freq = reference_freq
-        self._min_octave = min_octave
-        self._max_octave = max_octave
-        self._notes = self._make_notes()
+        self._make_notes(min_octave, max_octave)
 
         self._ratios = np.array([])
         self._cents = np.array([])
+        # Filled by `_calculate_frequencies`; read on every tuner frame.
+        self._freq_order = np.array([], dtype=int)
+        self._freq_log2 = np.array([])
 
     def __repr__(self):
         return '%s %s@%sHz' % (
@@ -103,7 +155,10 @@ class Temperament():
             raise ValueError(
                 'Reference note must be of the "Note" type, not %s' % type(
                     note))
+        ref_idx = self._find_reference(
+            note, self._min_octave, self._max_octave)
         self._reference_note = note
+        self._ref_idx = ref_idx
         self._calculate_frequencies()
 
     @property
@@ -123,8 +178,7 @@ class Temperament():
 
     @min_octave.setter
     def min_octave(self, min_octave):
-        self._min_octave = min_octave
-        self._make_notes()
+        self._make_notes(min_octave, self._max_octave)
         self._calculate_frequencies()
 
     @property
@@ -134,8 +188,7 @@ class Temperament():
 
     @max_octave.setter
     def max_octave(self, max_octave):
-        self._max_octave = max_octave
-        self._make_notes()
+        self._make_notes(self._min_octave, max_octave)
         self._calculate_frequencies()
 
     @property
@@ -163,50 +216,75 @@ class Temperament():
     @property
     def notes(self):
         """Notes calculated for the temperament."""
+        if self._notes is None:
+            self._notes = [
+                Note(tone, octave, freq) for tone, octave, freq in zip(
+                    self._tones.tolist(), self._octaves.tolist(),
+                    self._freqs.tolist())]
         return self._notes
 
     @property
     def frequencies(self):
         """Frequencies (in Hz) associated with `notes`."""
-        return np.array([x.frequency for x in self._notes])
-
-    def _make_notes(self):
-        notes = []
-
-        i = 0
-        tone = 'C'
-        octave = self._min_octave
-        while octave < self._max_octave + 1:
-            new_note = Note(tone, octave)
-            if new_note == self._reference_note:
-                new_note.frequency = self._reference_freq
-            notes.append(new_note)
-            i += 1
-            if i == len(TONES):
-                i = 0
-                octave += 1
-            tone = TONES[i]
-
-        return notes
+        return self._freqs
+
+    def nearest(self, freqs):
+        """
+        Find the nearest note to each of `freqs` (in Hz).
+
+        Returns:
+            idxs (np.array) - indices into `notes` and `frequencies`
+            cents (np.array) - cents sharp (+) or flat (-) of those notes
+        """
+        log2 = np.log2(freqs)
+        pos = np.searchsorted(self._freq_log2, log2)
+        pos = np.clip(pos, 1, len(self._freq_log2) - 1)
+        left = self._freq_log2[pos-1]
+        right = self._freq_log2[pos]
+        pos -= (log2 - left) < (right - log2)
+        cents = (1200 * (log2 - self._freq_log2[pos])).astype(np.int32)
+        return self._freq_order[pos], cents
+
+    def _make_notes(self, min_octave, max_octave):
+        # Notes are stored as parallel arrays; `notes` builds `Note`
+        # objects from them only when asked.  Nothing is stored until the
+        # reference note is known to be in range.
+        ref_idx = self._find_reference(
+            self._reference_note, min_octave, max_octave)
+        n_octaves = max_octave - min_octave + 1
+        self._min_octave = min_octave
+        self._max_octave = max_octave
+        self._tones = np.array(TONES * n_octaves)
+        self._octaves = np.repeat(
+            np.arange(min_octave, max_octave + 1), len(TONES))
+        self._freqs = np.full(len(self._tones), np.nan)
+        self._notes = None
+        self._oct_power = 2.**np.arange(n_octaves)
+        self._ref_idx = ref_idx
+
+    @staticmethod
+    def _find_reference(note, min_octave, max_octave):
+        if note.tone not in TONES or not (
+                min_octave <= note.octave <= max_octave):
+            raise ValueError(
+                'Reference note %s is not within octaves %s-%s' % (
+                    note, min_octave, max_octave))
+        return (note.octave - min_octave) * len(TONES) + TONES.index(note.tone)
 
     def _calculate_base_freq(self):
-        ref_idx = self.notes.index(self._reference_note) % len(self._ratios)
-        oct_ratio = 2**(self.notes[0].octave - self._reference_note.octave)
+        ref_idx = self._ref_idx % len(self._ratios)
+        oct_ratio = 2**(self._min_octave - self._reference_note.octave)
         return oct_ratio * self._reference_freq / self._ratios[ref_idx]
 
-
     def _calculate_frequencies(self):
-        self._notes[0].frequency = self._calculate_base_freq()
-        i = 0
-        oct_diff = 0
-        for note in self._notes:
-            ratio = self._ratios[i] * 2**(oct_diff)
-            note.frequency = ratio * self._notes[0].frequency
+        grid = self._ratios[None, :] * self._oct_power[:, None]
+        self._freqs = self._calculate_base_freq() * grid.ravel()
+        self._freqs.setflags(write=False)
+        self._notes = None
 
-            i += 1
-            if i == len(self._ratios):
-                i = 0
-                oct_diff += 1
+        # Sorted log2 frequencies let `nearest` bisect instead of scan.
+        self._freq_order = np.argsort(self._freqs)
+        self._freq_log2 = np.log2(self._freqs[self._freq_order])
 
 
 class EqualTemperament(Temperament):
@@ -218,7 +296,8 @@ class EqualTemperament(Temperament):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'Equal'
-        self.cents = np.arange(0, 1200, 100)
+        self._ratios, self._cents = _EQUAL
+        self._calculate_frequencies()
 
 
 class JustTemperament(Temperament):
@@ -231,8 +310,8 @@ class JustTemperament(Temperament):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._name = 'Just'
-        self.ratios = np.array([
-            1, 16/15, 9/8, 6/5, 5/4, 4/3, 64/45, 3/2, 8/5, 5/3, 19/9, 15/8])
+        self._ratios, self._cents = _JUST
+        self._calculate_frequencies()
 
 
 class PythagoreanTemperament(Temperament):
@@ -244,9 +323,8 @@ class PythagoreanTemperament(Temperament):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'Pythagorean'
-        self.ratios = np.array([
-            1, 256/243, 9/8, 32/27, 81/64, 4/3,
-            729/512, 3/2, 128/81, 27/16, 16/9, 243/128])
+        self._ratios, self._cents = _PYTHAGOREAN
+        self._calculate_frequencies()
 
 
 class MeanToneTemperament(Temperament):
@@ -258,10 +336,8 @@ class MeanToneTemperament(Temperament):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'Meantone'
-        self.cents = np.array([
-            0, 81.427, 194.135, 306.842, 388.270, 502.933,
-            583.383, 697.067, 780.450, 891.202, 1004.888, 1085.338
-            ])
+        self._ratios, self._cents = _MEANTONE
+        self._calculate_frequencies()
 
 class WellTemperament(Temperament):
     """
@@ -272,10 +348,8 @@ class WellTemperament(Temperament):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'Well-Tempered'
-        self.cents = np.array([
-            0, 90.225, 193.484, 294.135, 386.968, 498.045,
-            588.270, 696.742, 792.180, 890.226, 996.090, 1088.923
-            ])
+        self._ratios, self._cents = _WELL
+        self._calculate_frequencies()
 
 
 class RameauTemperament(Temperament):
@@ -289,10 +363,8 @@ class RameauTemperament(Temperament):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'Rameau'
-        self.cents = np.array([
-            0, 84.360, 192.180, 288.270, 384.360, 503.910,
-            582.405, 696.090, 786.315, 888.270, 996.090, 1080.450
-            ])
+        self._ratios, self._cents = _RAMEAU
+        self._calculate_frequencies()
 
 
 class WerckmeisterITemperament(Temperament):
@@ -306,10 +378,8 @@ class WerckmeisterITemperament(Temperament):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'Werckmeister I (III)'
-        self.cents = np.array([
-            0, 90.225, 192.180, 294.135, 390.225, 498.045,
-            588.270, 696.090, 792.180, 888.270, 996.090, 1092.180
-            ])
+        self._ratios, self._cents = _WERCKMEISTER_I
+        self._calculate_frequencies()
 
 
 class KirnbergerIIITemperament(Temperament):
@@ -324,10 +394,8 @@ class KirnbergerIIITemperament(Temperament):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'Kirnberger III'
-        self.cents = np.array([
-            0, 90.225, 203.910, 294.135, 386.315, 498.045,
-            590.225, 701.955, 792.180, 884.360, 996.090, 1088.270
-            ])
+        self._ratios, self._cents = _KIRNBERGER_III
+        self._calculate_frequencies()
 
 
 class VallottiYoungTemperament(Temperament):
@@ -337,5 +405,5 @@ class VallottiYoungTemperament(Temperament):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'Vallotti & Young'
-        self.cents = np.array([
-            0, 94, 196, 278, 392, 475, 588, 696, 790, 894, 975, 1090])
+        self._ratios, self._cents = _VALLOTTI_YOUNG
+        self._calculate_frequencies()
@@ -13,9 +13,14 @@ When run:
 """
 
 
+from collections import deque
+import threading
+
+from matplotlib.collections import LineCollection
 import matplotlib.pyplot as plt
 import numpy as np
 import pyaudio
+from scipy.fft import next_fast_len, rfft
 from scipy.signal import find_peaks
 
 from temperaments import JustTemperament
@@ -30,7 +35,7 @@ class Tuner:
 
     Methods:
         loop - Run the main loop; read in audio and process. Calls `graph`.
-        fft - Perform an FFT on `data`
+        fft - Perform an FFT on the latest `fft_window` samples of `data`
         graph - Graph the current `data` in different forms. Calls `fft`.
 
     Instance variables:
@@ -38,6 +43,10 @@ class Tuner:
         channels (int) - number of channels to read, default 1
         rate (int) - audio rate, default 16000
         chunk (int) - how often to read audio and calculate `fft`, default 2048
+        max_seconds (int) - length of audio history to keep, default 4
+        fft_window (int) - number of latest samples to analyze, default 8192
+        fft_alpha (float 0-1) - weight of each new spectrum in the running
+                                average, default 0.3
         start_thresh (float 0-1) - noise must be above this threshold to be
                                    processed, default 0.1
         temperament (temperaments.Temperament) - Tuning temperament to use,
@@ -51,6 +60,11 @@ class Tuner:
             rate (int) - audio rate, default 16000
             chunk (int) - how often to read audio and calculate `fft`,
                 default 2048
+            max_seconds (int) - length of audio history to keep, default 4
+            fft_window (int) - number of latest samples to analyze,
+                default 8192
+            fft_alpha (float 0-1) - weight of each new spectrum in the
+                running average, default 0.3
             start_thresh (float 0-1) - noise must be above this threshold
                 to be processed, default 0.05
             temperament (temperaments.Temperament) - Tuning temperament to
@@ -60,21 +74,68 @@ class Tuner:
         self.channels = 1
         self.rate = 16000
         self.chunk = 2048
+        self.max_seconds = 4
+        self.fft_window = 8192
+        self.fft_alpha = 0.3
         self.start_thresh = 0.05
         self.temperament = JustTemperament()
         for key, value in kwargs.items():
             self.__dict__[key] = value
 
         self._pyaudio = pyaudio.PyAudio()
-        self._data = np.array([])
-        self._best_freq = np.array([])
+        # Ring buffers: `_write` is the next index to fill, `_filled` is
+        # how many samples are valid.  Nothing is reallocated while running.
+        self._data = np.zeros(self.rate * self.max_seconds, dtype=np.float32)
+        self._write = 0
+        self._filled = 0
+        self._time_axis = np.arange(len(self._data)) / self.rate
+        self._best_freq = deque(maxlen=len(self._data) // self.chunk)
+        # The FFT always sees at most `fft_window` samples, so its window,
+        # length, and bin frequencies are fixed.  Zero-pad to a fast length
+        # of at least `rate` so bins are never wider than 1 Hz.
+        self._hann = np.hanning(self.fft_window)
+        self._fft_n = next_fast_len(
+            max(self.fft_window, self.rate), real=True)
+        self._fft_freqs = np.fft.rfftfreq(self._fft_n, 1. / self.rate)
+        self._spec_avg = None
+        self._resets = 0
+        # Audio arrives on PyAudio's thread; `_lock` guards the ring buffer
+        # and `_new_data` wakes `loop` to redraw.
+        self._lock = threading.Lock()
+        self._new_data = threading.Event()
+        self._setup_figure()
+
+    def _setup_figure(self):
+        """Create the figure and the artists `graph` updates in place."""
+        self._fig, (wave_ax, spec_ax) = plt.subplots(2, 1)
+
+        # Waveform.
+        self._wave_line, = wave_ax.plot([], [])
+        wave_ax.set_xlabel('time (s)')
+        wave_ax.set_ylabel('amplitude')
+
+        # Frequency spectrum, peak markers, and a pool of peak labels.
+        self._spec_line, = spec_ax.plot([], [])
+        self._peak_lines = LineCollection([], colors='red')
+        spec_ax.add_collection(self._peak_lines)
+        self._labels = []
+        self._label_keys = []
+        self._label_notes = None
+        freqs_t = self.temperament.frequencies
+        spec_ax.set_xlim([freqs_t.min()-100, freqs_t.max()+100])
+        spec_ax.set_xlabel('frequency (Hz)')
+        spec_ax.set_ylabel('amplitude')
+
+        self._wave_ax = wave_ax
+        self._spec_ax = spec_ax
+        self._fig.tight_layout()
 
     def loop(self):
         """
         Run the main tuner loop until `KeyboardInterrupt`.
 
         While True:
-            read input from audio source
+            wait for `_callback` to store new audio
             analyze FFT of data
             plot to screen
         """
@@ -84,26 +145,102 @@ class Tuner:
             rate=self.rate,
             input=True,
             output=False,
-            frames_per_buffer=self.chunk)
+            frames_per_buffer=self.chunk,
+            stream_callback=self._callback)
+        self._fig.show()
 
         try:
-            while True:
-                audio = stream.read(self.chunk)
-                audio = np.frombuffer(audio, np.float32)
-                if audio.max() > self.start_thresh:
-                    self._data = np.append(self._data, audio)
-                    self.graph()
+            while stream.is_active():
+                if self._new_data.wait(timeout=0.1):
+                    self._new_data.clear()
+                    # A silence reset may have emptied the buffer since.
+                    with self._lock:
+                        filled = self._filled
+                    if filled:
+                        self.graph()
                 else:
-                    self._data = np.array([])
-                    self._best_freq = np.array([])
+                    self._fig.canvas.flush_events()
         except KeyboardInterrupt:
             self._pyaudio.close(stream)
 
+    def _callback(self, in_data, frame_count, time_info, status):
+        """Store a chunk of audio from `pyaudio`; runs on its own thread."""
+        # pylint: disable=unused-argument
+        # Signature is fixed by pyaudio.
+        audio = np.frombuffer(in_data, np.float32)
+        with self._lock:
+            if audio.max() > self.start_thresh:
+                self._push(audio)
+                self._new_data.set()
+            else:
+                self._filled = self._write = 0
+                self._best_freq.clear()
+                self._spec_avg = None
+                self._resets += 1
+        return None, pyaudio.paContinue
+
+    def _push(self, audio):
+        """Copy `audio` into the `data` ring buffer, wrapping at the end."""
+        buflen = len(self._data)
+        audio = audio[-buflen:]
+        head = min(len(audio), buflen - self._write)
+        self._data[self._write:self._write+head] = audio[:head]
+        self._data[:len(audio)-head] = audio[head:]
+        self._write = (self._write + len(audio)) % buflen
+        self._filled = min(self._filled + len(audio), buflen)
+
+    def _samples(self, count=None):
+        """Return a copy of the latest `count` valid samples, oldest first."""
+        with self._lock:
+            if count is None or count > self._filled:
+                count = self._filled
+            start = self._write - count
+            if start >= 0:
+                return self._data[start:self._write].copy()
+            return np.concatenate(
+                (self._data[start:], self._data[:self._write]))
+
     def fft(self):
-        """Calculate the FFT of `data`."""
-        fft = np.fft.fft(self._data, n=self.rate).real
-        frequencies = np.fft.fftfreq(len(fft)) * self.rate
-        return frequencies, fft
+        """Calculate the magnitude spectrum of `data` near `temperament`."""
+        # Hann window to limit leakage; analyze only the latest samples so
+        # the cost per frame does not grow while a note is held.
+        with self._lock:
+            resets = self._resets
+            spec_avg = self._spec_avg
+        data = self._samples(self.fft_window)
+        if len(data) == len(self._hann):
+            window = self._hann
+        else:
+            window = np.hanning(len(data))
+        fft = rfft(data * window, n=self._fft_n, workers=-1)
+        frequencies = self._fft_freqs
+
+        # Only bins within 100 Hz of the temperament are ever plotted or
+        # searched for peaks; drop the rest before taking magnitudes.
+        freqs_t = self.temperament.frequencies
+        band = slice(*np.searchsorted(
+            frequencies, [freqs_t.min()-100, freqs_t.max()+100]))
+        spec = np.abs(fft[band])
+
+        # Exponential average across frames to steady the peaks.  Drop it
+        # if `_callback` reset for silence while this frame was computed.
+        if spec_avg is not None and spec_avg.shape == spec.shape:
+            spec = self.fft_alpha*spec + (1-self.fft_alpha)*spec_avg
+        with self._lock:
+            if resets == self._resets:
+                self._spec_avg = spec
+        return frequencies[band], spec
+
+    @staticmethod
+    def _interpolate_peaks(freqs, fft, peaks):
+        """Refine `peaks` bins to sub-bin frequencies with a log parabola."""
+        # `find_peaks` never returns the first or last bin.
+        left, mid, right = (
+            np.log(fft[peaks+i] + 1e-12) for i in (-1, 0, 1))
+        denom = left - 2*mid + right
+        offset = np.divide(0.5 * (left-right), denom,
+                           out=np.zeros_like(denom), where=denom != 0)
+        return freqs[peaks] + offset * (freqs[1] - freqs[0])
 
     def graph(self):
         """
@@ -115,58 +252,62 @@ class Tuner:
                 "best" frequency is indicated with a dashed vertical line
                 and a text label indicating the tone and cents sharp/flat
         """
-        # pylint: disable=invalid-name
-        # 'xs' is a totally valid name for x-data.
-        plt.clf()
-
         # Plot waveform.
-        plt.subplot(211)
-        xs = np.arange(0, len(self._data)) / self.rate
-        plt.plot(xs, self._data)
-        plt.xlabel('time (s)')
-        plt.ylabel('amplitude')
+        data = self._samples()
+        self._wave_line.set_data(self._time_axis[:len(data)], data)
+        self._wave_ax.relim()
+        self._wave_ax.autoscale_view()
 
         # Plot frequency spectrum.
         freqs, fft = self.fft()
-        plt.subplot(212)
-        plt.plot(freqs, fft)
-        plt.xlim([self.temperament.frequencies.min()-100,
-                  self.temperament.frequencies.max()+100])
-        plt.ylim(bottom=0)
-        plt.xlabel('frequency (Hz)')
-        plt.ylabel('amplitude')
-
-        # Identify peaks.
-        peaks, _ = find_peaks(fft, height=min(25, fft.max()/2), distance=200)
-        peaks = peaks[:len(peaks)//2]
-        peak_freqs = freqs[peaks]
+        self._spec_line.set_data(freqs, fft)
+        self._spec_ax.set_ylim(bottom=0, top=1.05*fft.max())
+        notes_t = self.temperament.notes
+
+        # Identify peaks at least 200 Hz apart.
+        hz_per_bin = freqs[1] - freqs[0]
+        peaks, _ = find_peaks(fft, height=min(25, fft.max()/2),
+                              distance=max(1, int(200 / hz_per_bin)))
+        peak_freqs = self._interpolate_peaks(freqs, fft, peaks)
         peak_amps = fft[peaks]
-        for freq, amp in zip(peak_freqs, peak_amps):
-            if amp == peak_amps.max():
-                self._best_freq = np.append(self._best_freq, freq)
-            desired_idx = np.abs(self.temperament.frequencies-freq).argmin()
-            desired_freq = self.temperament.frequencies[desired_idx]
-            desired_note = self.temperament.notes[desired_idx]
-            try:
-                cents = int(1200 * np.log2(freq/desired_freq))
-            except OverflowError:
-                cents = 0
-
-            # Plot local maximum on frequency spectrum.
-            xs = np.array([freq, freq])
-            ys = np.array([0, amp])
-            plt.plot(xs, ys, color='red')
-
-            # Label peak with nearest note and cents sharp/flat.
-            sign = '+' if cents > 0 else ''
-            note_str = '%s %s%s' % (desired_note, sign, cents)
-            if amp == peak_amps.max():
-                print(note_str)
-            plt.text(freq+20, amp-5, note_str, fontsize=16)
-
-        # Keep things looking nice; don't update too often.
-        plt.tight_layout()
-        plt.pause(0.01)
+
+        desired_idxs, all_cents = self.temperament.nearest(peak_freqs)
+        best = peak_amps.argmax() if len(peaks) else -1
+
+        # Mark local maxima on frequency spectrum.
+        self._peak_lines.set_segments(
+            [[(freq, 0), (freq, amp)]
+             for freq, amp in zip(peak_freqs, peak_amps)])
+
+        while len(self._labels) < len(peaks):
+            self._labels.append(self._spec_ax.text(0, 0, '', fontsize=16))
+            self._label_keys.append(None)
+        for label in self._labels[len(peaks):]:
+            label.set_visible(False)
+        if notes_t is not self._label_notes:
+            self._label_keys = [None] * len(self._labels)
+            self._label_notes = notes_t
+
+        for i, (freq, amp) in enumerate(zip(peak_freqs, peak_amps)):
+            if i == best:
+                self._best_freq.append(freq)
+            label = self._labels[i]
+            label.set_position((freq+20, amp-5))
+            label.set_visible(True)
+
+            # Label peak with nearest note and cents sharp/flat; the text
+            # only needs formatting when the note or cents change.
+            key = (desired_idxs[i], all_cents[i])
+            if key != self._label_keys[i]:
+                desired_note = notes_t[key[0]]
+                sign = '+' if key[1] > 0 else ''
+                label.set_text('%s %s%s' % (desired_note, sign, key[1]))
+                self._label_keys[i] = key
+            if i == best:
+                print(label.get_text())
+
+        self._fig.canvas.draw_idle()
+        self._fig.canvas.flush_events()
 
 
 if __name__ == '__main__':